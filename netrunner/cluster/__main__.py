@@ -4,15 +4,16 @@ import functools
 from multiprocessing import Pool
 from netrunner.alwaysberunning.alwaysberunning import AlwaysBeRunning
 import sys
-from typing import Tuple
+from typing import List, Tuple
 
+from netrunner.cluster.checkpoint import Checkpoint
 from netrunner.cluster.clustering import cluster_decklists
-from netrunner.cluster.data_collection import all_events, decklists_from_event
+from netrunner.cluster.data_collection import EntryDecks, all_events, collect_event, failed_urls
 from netrunner.cluster.most_common import most_common_cards
 
 
 def main():
-    output_file, start_date, end_date, tournament_format, top_percentage, eps, min_samples = args()
+    output_file, start_date, end_date, tournament_format, top_percentage, eps, min_samples, checkpoint_dir, resume = args()
     abr = AlwaysBeRunning()
 
     print(f"[+] Getting completed {tournament_format} events from {start_date.isoformat()} to {end_date.isoformat()}")
@@ -27,17 +28,39 @@ def main():
         )
     )
 
-    print(f"[+] Getting decklists for {len(events)} tournaments")
+    # Reuse any events already collected by a previous run, and only retry the
+    # decklists that failed in those that weren't fully collected.
+    checkpoint = Checkpoint(checkpoint_dir, top_percentage, resume)
+    decklists: List[EntryDecks] = []
+    jobs = []
+    for event in events:
+        previous = checkpoint.load(event)
+        if previous is not None and len(failed_urls(previous)) == 0:
+            decklists.extend(previous)
+        else:
+            jobs.append((event, previous))
+
+    if resume:
+        print(f"[+] Resuming with {len(events) - len(jobs)} tournaments already collected")
+
+    print(f"[+] Getting decklists for {len(jobs)} tournaments")
 
     # Get all decklists from these events that match our filters, split out over
-    # a multiprocessing pool to get it done quicker.
-    decklist_getter = functools.partial(decklists_from_event, top_percentage)
+    # a multiprocessing pool to get it done quicker. Each event is checkpointed
+    # as soon as it finishes, so a crash only loses the events in flight.
+    collector = functools.partial(collect_event, top_percentage)
     with Pool() as pool:
-        decklists = [x for xs in pool.map(decklist_getter, events) for x in xs]
+        for event, decks in pool.imap_unordered(collector, jobs):
+            checkpoint.save(event, decks)
+            if decks is not None:
+                decklists.extend(decks)
+
+    if len(checkpoint.failed_urls) > 0:
+        print(f"[!] {len(checkpoint.failed_urls)} requests failed, see {checkpoint.ledger_file}. Run again with --resume to retry them")
 
     # Split our decklist tuples into corp and runner sets.
-    corp_decks = set([decklist[0] for decklist in decklists if decklist[0] is not None])
-    runner_decks = set([decklist[1] for decklist in decklists if decklist[1] is not None])
+    corp_decks = set([corp for (_, corp), _ in decklists if corp is not None])
+    runner_decks = set([runner for _, (_, runner) in decklists if runner is not None])
     
     # Cluster the decklists.
     print(f"[+] Clustering {len(corp_decks)} corp decks")
@@ -71,7 +94,7 @@ def main():
                 f.write(f"* [{card.title}](https://netrunnerdb.com/en/card/{card.code}) ({quantity} copies)\n")
 
 
-def args() -> Tuple[str, date, date, str, float, float, int]:
+def args() -> Tuple[str, date, date, str, float, float, int, str, bool]:
     """Parse commandline arguments."""
     parser = argparse.ArgumentParser(
         prog="cluster",
@@ -85,6 +108,8 @@ def args() -> Tuple[str, date, date, str, float, float, int]:
     parser.add_argument("--percentage", default=30, type=int, help="Percentage of decks to collect from tournaments (0-100)")
     parser.add_argument("--eps", default=7.5, type=float, help="EPS value for DBSSCAN algorithm")
     parser.add_argument("--min-samples", default=3, type=int, help="Minimum number of samples to form a cluster")
+    parser.add_argument("--checkpoint-dir", default="cluster_checkpoint", help="Directory to checkpoint collected decklists to")
+    parser.add_argument("--resume", action="store_true", help="Resume from the checkpoint, retrying only failed requests")
 
     args = parser.parse_args()
 
@@ -99,7 +124,9 @@ def args() -> Tuple[str, date, date, str, float, float, int]:
         args.format,
         args.percentage / 100,
         args.eps,
-        args.min_samples
+        args.min_samples,
+        args.checkpoint_dir,
+        args.resume
     )
 
 
@@ -0,0 +1,92 @@
+from netrunner.alwaysberunning.api import _API_ENDPOINT
+from netrunner.alwaysberunning.event import Event
+from netrunner.cluster.data_collection import EntryDecks, failed_urls
+import os
+import pickle
+from typing import Dict, List, Optional
+
+
+class Checkpoint:
+    """
+    On-disk record of the decklists collected so far.
+
+    Each event's decklists are written to their own file as soon as they are
+    collected, so a run that dies partway through can be resumed without
+    starting over. A ledger of every URL that failed is kept alongside them.
+    """
+
+    def __init__(self, directory: str, top_percentage: float, resume: bool = False) -> None:
+        """
+        Constructor.
+
+        :param directory: The directory to write checkpoint files to.
+        :param top_percentage: The top percentage of decks being collected.
+                               Checkpointed events collected with a different
+                               percentage are not reused.
+        :param resume: Whether to keep the existing checkpoint. If not, any
+                       previous checkpoint in the directory is cleared.
+        """
+        self.directory = directory
+        self.top_percentage = top_percentage
+        self.failures: Dict[int, List[str]] = dict()
+
+        os.makedirs(self.events_directory, exist_ok=True)
+        if not resume:
+            for filename in os.listdir(self.events_directory):
+                if filename.endswith(".pickle"):
+                    os.remove(os.path.join(self.events_directory, filename))
+            if os.path.exists(self.ledger_file):
+                os.remove(self.ledger_file)
+
+    @property
+    def events_directory(self) -> str:
+        return os.path.join(self.directory, "events")
+
+    @property
+    def ledger_file(self) -> str:
+        return os.path.join(self.directory, "failures.txt")
+
+    def event_file(self, event: Event) -> str:
+        return os.path.join(self.events_directory, f"{event.id}.pickle")
+
+    def load(self, event: Event) -> Optional[List[EntryDecks]]:
+        """Get the checkpointed decklists for an event, if there are any."""
+        try:
+            with open(self.event_file(event), "rb") as f:
+                checkpoint = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+        if checkpoint["top_percentage"] != self.top_percentage:
+            return None
+        return checkpoint["decks"]
+
+    def save(self, event: Event, decks: Optional[List[EntryDecks]]) -> None:
+        """
+        Checkpoint the decklists collected for an event and update the ledger.
+
+        If decks is None, the event entries could not be fetched, so only the
+        ledger is updated.
+        """
+        if decks is None:
+            self.failures[event.id] = [f"{_API_ENDPOINT}/entries?id={event.id}"]
+        else:
+            self.failures[event.id] = failed_urls(decks)
+            self.write(self.event_file(event), pickle.dumps({
+                "top_percentage": self.top_percentage,
+                "decks": decks,
+            }))
+
+        self.write(self.ledger_file, "".join(f"{url}\n" for url in self.failed_urls).encode("utf-8"))
+
+    @property
+    def failed_urls(self) -> List[str]:
+        """All URLs that failed in this run."""
+        return [url for urls in self.failures.values() for url in urls]
+
+    def write(self, filename: str, data: bytes) -> None:
+        """Write a file atomically, so a crash never leaves it half written."""
+        temporary_filename = f"{filename}.tmp"
+        with open(temporary_filename, "wb") as f:
+            f.write(data)
+        os.replace(temporary_filename, filename)
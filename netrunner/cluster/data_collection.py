@@ -6,6 +6,14 @@ import sys
 from typing import Optional, List, Set, Tuple
 
 
+# A decklist URL paired with the decklist fetched from it. The decklist is None
+# if there was no URL, or if fetching it failed.
+DeckSlot = Tuple[Optional[str], Optional[Decklist]]
+
+# The corp and runner deck slots for a single tournament entry.
+EntryDecks = Tuple[DeckSlot, DeckSlot]
+
+
 def all_events(abr: AlwaysBeRunning) -> Set[Event]:
     """Get all ABR events."""
     all_events: Set[Event] = set()
@@ -19,8 +27,12 @@ def all_events(abr: AlwaysBeRunning) -> Set[Event]:
     return all_events
 
 
-def decklists_from_event(top_percentage: float, tournament: Event) -> List[Tuple[Optional[Decklist], Optional[Decklist]]]:
-    """Get all decklists from an event that fall in the top given percentage."""
+def decklists_from_event(top_percentage: float, tournament: Event) -> Optional[List[EntryDecks]]:
+    """
+    Get all decklists from an event that fall in the top given percentage.
+
+    Returns None if the event entries could not be fetched.
+    """
     decks = []
 
     try:
@@ -28,23 +40,49 @@ def decklists_from_event(top_percentage: float, tournament: Event) -> List[Tuple
             lambda entry: 1 <= (entry.rank_swiss or 0) <= floor(len(tournament.entries()) * top_percentage),
             tournament.entries()
         ):
-            corp = None
-            runner = None
-
-            if entry.corp_deck_url is not None:
-                try:
-                    corp = Decklist(url=entry.corp_deck_url)
-                except:
-                    sys.stderr.write(f"failed on {entry.corp_deck_url}\n")
-
-            if entry.runner_deck_url is not None:
-                try:
-                    runner = Decklist(url=entry.runner_deck_url)
-                except:
-                    sys.stderr.write(f"failed on {entry.runner_deck_url}\n")
-
-            decks.append((corp, runner))
+            decks.append((fetch_decklist(entry.corp_deck_url), fetch_decklist(entry.runner_deck_url)))
     except:
         sys.stderr.write(f"failed on entries for {tournament.title}\n")
+        return None
 
     return decks
+
+
+def fetch_decklist(url: Optional[str]) -> DeckSlot:
+    """Fetch the decklist at the given URL, if there is one."""
+    if url is None:
+        return (None, None)
+
+    try:
+        return (url, Decklist(url=url))
+    except:
+        sys.stderr.write(f"failed on {url}\n")
+        return (url, None)
+
+
+def retry_failed_decklists(decks: List[EntryDecks]) -> List[EntryDecks]:
+    """Refetch any decklists that previously failed, keeping those that didn't."""
+    def retry(slot: DeckSlot) -> DeckSlot:
+        url, decklist = slot
+        return slot if url is None or decklist is not None else fetch_decklist(url)
+
+    return [(retry(corp), retry(runner)) for corp, runner in decks]
+
+
+def failed_urls(decks: List[EntryDecks]) -> List[str]:
+    """Get the URLs of all decklists that failed to fetch."""
+    return [url for entry in decks for url, decklist in entry if url is not None and decklist is None]
+
+
+def collect_event(top_percentage: float,
+                  job: Tuple[Event, Optional[List[EntryDecks]]]) -> Tuple[Event, Optional[List[EntryDecks]]]:
+    """
+    Collect decklists for an event, for use as a multiprocessing pool worker.
+
+    The job is the event, along with any decklists previously collected from
+    it. If there are previous decklists, only the failed ones are refetched.
+    """
+    event, previous = job
+    if previous is None:
+        return (event, decklists_from_event(top_percentage, event))
+    return (event, retry_failed_decklists(previous))